@@ -3,111 +3,327 @@
 # --------------------------------------------------------------
 import streamlit as st
 import pandas as pd
-import requests
+import numpy as np
+import orjson
+import aiohttp
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+import asyncio
+import itertools
+import random
 import os
+import io
+import time
+import csv
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 # --------------------- Config ---------------------
-BASE = "https://alfa-leetcode-api.onrender.com"
+GRAPHQL = "https://leetcode.com/graphql"
 CSV_FILE = "tracked_users.csv"
 CACHE_TTL = 1800  # 30 minutes
+HTTP_CACHE = "lc_cache"  # SQLite file (lc_cache.sqlite) persisting API responses
+MAX_CONCURRENCY = 4  # keep low – the API rate-limits aggressive clients
+MAX_RETRIES = 3
+RETRY_BUDGET = 10  # seconds per request, retries included, before giving up
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 # Skill level order: Advanced (top) to Intermediate to Fundamental
-LEVEL_ORDER = {"Advanced": 0, "Intermediate": 1, "Fundamental": 2}
+LEVEL_ORDER = ["Advanced", "Intermediate", "Fundamental"]
+
+# --------------------- HTTP Cache ---------------------
+# Responses are cached on disk so restarts don't hit the API again. POST is
+# cached too: GraphQL queries are read-only and the request body is part of the
+# cache key. Built per event loop, since the SQLite connection is async.
+async def is_clean_response(response) -> bool:
+    # GraphQL reports failures inside a 200 body; don't pin those for CACHE_TTL
+    try:
+        return not orjson.loads(await response.read()).get("errors")
+    except (orjson.JSONDecodeError, AttributeError):
+        return False
+
+def http_cache() -> SQLiteBackend:
+    return SQLiteBackend(
+        HTTP_CACHE,
+        expire_after=CACHE_TTL,
+        allowed_codes=(200,),
+        allowed_methods=("GET", "POST"),
+        filter_fn=is_clean_response,
+    )
+
+async def clear_http_cache():
+    cache = http_cache()
+    await cache.clear()
+    await cache.close()
 
 # --------------------- Utilities ---------------------
 def init_csv():
     if not os.path.exists(CSV_FILE):
         pd.DataFrame(columns=["username", "added_at"]).to_csv(CSV_FILE, index=False)
 
-def load_users() -> pd.DataFrame:
-    init_csv()
-    df = pd.read_csv(CSV_FILE)
+@st.cache_data(show_spinner=False)
+def _load_users_cached(mtime: float) -> pd.DataFrame:
+    # pyarrow (already a streamlit dependency) parses in C and infers added_at as datetime
+    df = pd.read_csv(CSV_FILE, engine="pyarrow", dtype={"username": str})
     if "added_at" not in df.columns:
         df["added_at"] = pd.NaT
     return df
 
+def load_users() -> pd.DataFrame:
+    # Keyed on mtime: re-parsed only when the file changes (including outside edits)
+    init_csv()
+    return _load_users_cached(os.path.getmtime(CSV_FILE))
+
 def save_users(df: pd.DataFrame):
     df.to_csv(CSV_FILE, index=False)
+    _load_users_cached.clear()
 
-def add_user(username: str) -> bool:
-    df = load_users()
-    username = username.strip()
-    if username and username not in df["username"].values:
-        new_row = pd.DataFrame([{"username": username, "added_at": pd.Timestamp.now()}])
-        df = pd.concat([df, new_row], ignore_index=True)
-        save_users(df)
-        return True
-    return False
-
-def remove_user(username: str):
+def _load_usernames() -> tuple[list[str], list[str]]:
+    """Header and usernames straight from the CSV, without going through pandas."""
+    init_csv()
+    with open(CSV_FILE, newline="") as f:
+        reader = csv.DictReader(f)
+        usernames = [row["username"] for row in reader]
+        return reader.fieldnames or ["username", "added_at"], usernames
+
+def add_users(usernames: list[str]) -> list[str]:
+    """Add every new username in one write; returns the ones actually added.
+
+    Normally a plain append. A file without an added_at column is rewritten once
+    through pandas to add it, so later calls can append again."""
+    header, existing = _load_usernames()
+    seen = set(existing)
+    added = []
+    for u in (x.strip() for x in usernames):
+        if u and u not in seen:
+            seen.add(u)
+            added.append(u)
+    if not added:
+        return []
+    now = datetime.now().isoformat(sep=" ")
+    if "added_at" not in header:
+        new_rows = pd.DataFrame({"username": added, "added_at": now})
+        save_users(pd.concat([load_users(), new_rows], ignore_index=True))
+        return added
+    # Append the rows instead of rewriting the whole file
+    missing_newline = False
+    if os.path.getsize(CSV_FILE):
+        with open(CSV_FILE, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            missing_newline = f.read(1) != b"\n"
+    with open(CSV_FILE, "a", newline="") as f:
+        if missing_newline:
+            f.write("\n")
+        csv.DictWriter(f, fieldnames=header, extrasaction="ignore", lineterminator="\n").writerows(
+            {"username": u, "added_at": now} for u in added)
+    _load_users_cached.clear()
+    return added
+
+def remove_users(usernames: list[str]):
     df = load_users()
-    df = df[df["username"] != username]
+    df = df[~df["username"].isin(usernames)]
     save_users(df)
 
 # --------------------- API Calls ---------------------
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
-def get_profile(username: str) -> dict | None:
-    try:
-        r = requests.get(f"{BASE}/userProfile/{username}", timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        st.error(f"Profile error ({username}): {e}")
-        return None
+# Profile stats and skill tags in a single round-trip per user.
+USER_QUERY = """
+query userBundle($username: String!) {
+  matchedUser(username: $username) {
+    profile { ranking }
+    submitStats {
+      acSubmissionNum { difficulty count submissions }
+      totalSubmissionNum { difficulty count submissions }
+    }
+    tagProblemCounts {
+      advanced { tagName problemsSolved }
+      intermediate { tagName problemsSolved }
+      fundamental { tagName problemsSolved }
+    }
+  }
+}
+"""
+
+def retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before the next try: the server's Retry-After if given,
+    otherwise exponential backoff with jitter."""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(retry_after)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    base = 0.5 * 2 ** attempt
+    return base + random.uniform(0, base)
+
+async def post_graphql(session: aiohttp.ClientSession, payload: dict) -> dict:
+    # Retries 429/5xx and dropped connections, but never starts a new attempt
+    # past RETRY_BUDGET so an unreachable API can't stall the page for long
+    deadline = time.monotonic() + RETRY_BUDGET
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with session.post(GRAPHQL, json=payload) as r:
+                delay = retry_delay(attempt, r.headers.get("Retry-After"))
+                if (r.status not in RETRY_STATUSES or attempt == MAX_RETRIES
+                        or time.monotonic() + delay > deadline):
+                    r.raise_for_status()
+                    return orjson.loads(await r.read())
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            delay = retry_delay(attempt)
+            if attempt == MAX_RETRIES or time.monotonic() + delay > deadline:
+                raise
+        await asyncio.sleep(delay)
+
+async def fetch_user(session: aiohttp.ClientSession, sem: asyncio.Semaphore, username: str) -> dict:
+    async with sem:
+        data = await post_graphql(session, {"query": USER_QUERY, "variables": {"username": username}})
+    user = (data.get("data") or {}).get("matchedUser")
+    if data.get("errors"):
+        raise ValueError(data["errors"][0].get("message", "GraphQL error"))
+    if not user:
+        raise ValueError("user not found")
+    return user
+
+async def fetch_all(usernames: list[str], on_done=lambda: None) -> dict[str, dict | Exception]:
+    """matchedUser payload per username, or the exception its fetch raised."""
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with CachedSession(cache=http_cache(),
+                             headers={"Referer": "https://leetcode.com"},
+                             timeout=aiohttp.ClientTimeout(total=10, sock_connect=5)) as session:
+        async def one(username):
+            try:
+                res = await fetch_user(session, sem, username)
+            except Exception as e:
+                res = e
+            on_done()
+            return username, res
+        return dict(await asyncio.gather(*(one(u) for u in usernames)))
+
+def build_all_skills(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def build_skill_pivot(all_skills: pd.DataFrame) -> pd.DataFrame:
+    # (Skill, Level) x Username – shared by the single-skill view and the heatmap
+    if all_skills.empty:
+        return pd.DataFrame()
+    return all_skills.pivot_table(
+        index=["Skill", "Level"],
+        columns="Username",
+        values="Problems Solved",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True
+    )
+
+def build_profile(user: dict) -> dict:
+    # Same keys the old /userProfile endpoint returned
+    stats = user.get("submitStats") or {}
+    solved = {x["difficulty"]: x["count"] for x in stats.get("acSubmissionNum", [])}
+    profile = {
+        "totalSolved": solved.get("All", 0),
+        "easySolved": solved.get("Easy", 0),
+        "mediumSolved": solved.get("Medium", 0),
+        "hardSolved": solved.get("Hard", 0),
+        "matchedUserStats": stats,
+    }
+    # Omit a null ranking so callers' "N/A" default applies
+    ranking = (user.get("profile") or {}).get("ranking")
+    if ranking is not None:
+        profile["ranking"] = ranking
+    return profile
 
 def compute_accuracy(profile: dict) -> float:
-    try:
-        ac = profile["matchedUserStats"]["acSubmissionNum"]
-        total = profile["matchedUserStats"]["totalSubmissionNum"]
-        for a, t in zip(ac, total):
-            if a["difficulty"] == "All":
-                sub = t["submissions"]
-                return round(a["submissions"] / sub * 100, 2) if sub else 0.0
-    except Exception:
-        pass
+    stats = profile.get("matchedUserStats") or {}
+    ac = next((x for x in stats.get("acSubmissionNum", ()) if x["difficulty"] == "All"), None)
+    tot = next((x for x in stats.get("totalSubmissionNum", ()) if x["difficulty"] == "All"), None)
+    if ac and tot and tot["submissions"]:
+        return round(ac["submissions"] / tot["submissions"] * 100, 2)
     return 0.0
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
-def get_skill_table(username: str) -> pd.DataFrame:
-    try:
-        r = requests.get(f"{BASE}/{username}/skill", timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        records = []
-        for level_raw, skills in data.items():
-            level = level_raw.capitalize()
-            if level not in LEVEL_ORDER:
-                level = "Fundamental"  # fallback
-            if isinstance(skills, list):
-                for s in skills:
-                    records.append({
-                        "Level": level,
-                        "Skill": s.get("tagName", "Unknown"),
-                        "Problems Solved": s.get("problemsSolved", 0),
-                        "Username": username,
-                        "_sort": LEVEL_ORDER.get(level, 2)
-                    })
-        df = pd.DataFrame(records)
-        if df.empty:
-            return pd.DataFrame()
-        df = df.sort_values(["_sort", "Problems Solved"], ascending=[True, False])
-        return df.drop(columns=["_sort"])
-    except Exception as e:
-        st.error(f"Skill error ({username}): {e}")
+def build_skill_table(username: str, data: dict) -> pd.DataFrame:
+    records = []
+    for level_raw, skills in data.items():
+        level = level_raw.capitalize()
+        if level not in LEVEL_ORDER:
+            level = "Fundamental"  # fallback
+        if isinstance(skills, list):
+            for s in skills:
+                records.append({
+                    "Level": level,
+                    "Skill": s.get("tagName", "Unknown"),
+                    "Problems Solved": s.get("problemsSolved", 0),
+                    "Username": username,
+                })
+    df = pd.DataFrame(records)
+    if df.empty:
         return pd.DataFrame()
+    # Ordered categorical: sorting by Level follows LEVEL_ORDER everywhere downstream
+    df["Level"] = pd.Categorical(df["Level"], categories=LEVEL_ORDER, ordered=True)
+    return df.sort_values(["Level", "Problems Solved"], ascending=[True, False])
+
+# --------------------- Charts ---------------------
+# Cached as resources keyed on the input data: widget reruns get the same
+# figure object back (no unpickling), and entries expire with the data.
+# Figures are shared across sessions, so callers must not mutate them.
+@st.cache_resource(ttl=CACHE_TTL, max_entries=10, show_spinner=False)
+def total_solved_fig(df: pd.DataFrame) -> go.Figure:
+    fig = px.bar(df, x="Username", y="Total Solved", text="Total Solved",
+                 title="Total Problems Solved", color="Total Solved",
+                 color_continuous_scale="Viridis")
+    fig.update_traces(textposition="outside")
+    return fig
 
-def rank_change(old, new):
-    if pd.isna(old) or old == "N/A":
-        return ""
-    diff = old - new
-    if diff > 0:
-        return f"Up {diff}"
-    if diff < 0:
-        return f"Down {-diff}"
-    return "No change"
+@st.cache_resource(ttl=CACHE_TTL, max_entries=10, show_spinner=False)
+def difficulty_fig(df: pd.DataFrame) -> go.Figure:
+    diff_df = df.melt(id_vars="Username", value_vars=["Easy", "Medium", "Hard"],
+                      var_name="Difficulty", value_name="Solved")
+    fig = px.bar(diff_df, x="Username", y="Solved", color="Difficulty",
+                 title="Problems Solved by Difficulty",
+                 color_discrete_map={"Easy": "#2ca02c", "Medium": "#ff7f0e", "Hard": "#d62728"})
+    fig.update_layout(barmode="stack")
+    return fig
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=100, show_spinner=False)
+def difficulty_pie_fig(user: str, easy: int, medium: int, hard: int) -> go.Figure:
+    return px.pie(values=[easy, medium, hard], names=["Easy", "Medium", "Hard"],
+                  title=f"{user} – Difficulty")
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=10, show_spinner=False)
+def accuracy_fig(df: pd.DataFrame) -> go.Figure:
+    fig = px.bar(df, x="Username", y="Accuracy %", text="Accuracy %",
+                 title="Submission Accuracy", color="Accuracy %",
+                 color_continuous_scale="Blues")
+    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    return fig
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=100, show_spinner=False)
+def skill_comparison_fig(skill_pivot: pd.DataFrame, skill: str) -> go.Figure:
+    return px.bar(skill_pivot.reset_index(), x="Username", y="Problems Solved",
+                  title=f"{skill} Comparison",
+                  color="Problems Solved", color_continuous_scale="Viridis")
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=10, show_spinner=False)
+def skill_heatmap_fig(skill_matrix: pd.DataFrame) -> go.Figure:
+    pivot = skill_matrix.reset_index()
+    pivot = pivot.sort_values("Level", kind="stable")
+    y_labels = pivot["Skill"] + " (" + pivot["Level"].astype(str) + ")"
+
+    fig = go.Figure(data=go.Heatmap(
+        z=pivot.drop(columns=["Skill", "Level"]).values,
+        x=pivot.columns[2:],
+        y=y_labels,
+        colorscale="YlGnBu",
+        text=pivot.drop(columns=["Skill", "Level"]).values,
+        texttemplate="%{text}",
+        textfont=dict(size=10)
+    ))
+    fig.update_layout(title="Problems Solved per Skill", height=600)
+    return fig
 
 # --------------------- Session State ---------------------
 if "prev_ranks" not in st.session_state:
@@ -122,10 +338,7 @@ st.sidebar.header("Manage Users")
 bulk_input = st.sidebar.text_input("Add username(s) – comma separated:")
 if st.sidebar.button("Add User(s)"):
     if bulk_input.strip():
-        added = []
-        for u in [x.strip() for x in bulk_input.split(",") if x.strip()]:
-            if add_user(u):
-                added.append(u)
+        added = add_users(bulk_input.split(","))
         if added:
             st.sidebar.success(f"Added: {', '.join(added)}")
             st.rerun()
@@ -136,7 +349,10 @@ if st.sidebar.button("Add User(s)"):
 
 if st.sidebar.button("Refresh All (clear cache)"):
     st.cache_data.clear()
+    st.cache_resource.clear()
+    asyncio.run(clear_http_cache())
     st.session_state.prev_ranks = {}
+    st.session_state.pop("leaderboard", None)
     st.rerun()
 
 # ---------- Load Users ----------
@@ -148,90 +364,120 @@ if users_df.empty:
 usernames = users_df["username"].tolist()
 
 # ---------- Fetch Data ----------
-progress = st.progress(0)
-rows, skill_dfs = [], []
-
-for i, user in enumerate(usernames):
-    progress.progress((i + 1) / len(usernames))
-    with st.spinner(f"Fetching {user}…"):
-        prof = get_profile(user)
+# Widget interactions rerun the whole script; only hit the fetch path when the
+# user list changed, the data is older than CACHE_TTL, or Refresh was clicked.
+# Fetch errors are kept with the data and shown until then.
+loaded = st.session_state.get("leaderboard")
+if (loaded is None or loaded["users"] != tuple(usernames)
+        or time.time() - loaded["fetched_at"] > CACHE_TTL):
+    progress = st.progress(0)
+    cols = {c: [] for c in ["Username", "Total Solved", "Easy", "Medium", "Hard",
+                            "Accuracy %", "Rank"]}
+
+    # All users are fetched concurrently on one event loop; it runs on the
+    # script thread, so the progress callback can update Streamlit directly.
+    done = itertools.count(1)
+    with st.spinner(f"Fetching {len(usernames)} users…"):
+        results = asyncio.run(fetch_all(
+            usernames, on_done=lambda: progress.progress(next(done) / len(usernames))))
+
+    prev_ranks = dict(st.session_state.prev_ranks)
+    skill_frames, errors = [], {}
+    for user in usernames:
+        res = results[user]
+        prof = None
+        if isinstance(res, Exception):
+            errors[user] = str(res)
+        else:
+            prof = build_profile(res)
+            skill_frames.append(build_skill_table(user, res.get("tagProblemCounts") or {}))
         if prof:
-            rows.append({
-                "Username": user,
-                "Total Solved": prof.get("totalSolved", 0),
-                "Easy": prof.get("easySolved", 0),
-                "Medium": prof.get("mediumSolved", 0),
-                "Hard": prof.get("hardSolved", 0),
-                "Accuracy %": compute_accuracy(prof),
-                "Rank": prof.get("ranking", "N/A"),
-                "Rank Delta": rank_change(st.session_state.prev_ranks.get(user), prof.get("ranking")),
-            })
-            skill_dfs.append(get_skill_table(user))
-        st.session_state.prev_ranks[user] = prof.get("ranking") if prof else "N/A"
-
-progress.empty()
-
-if not rows:
+            cols["Username"].append(user)
+            cols["Total Solved"].append(prof.get("totalSolved", 0))
+            cols["Easy"].append(prof.get("easySolved", 0))
+            cols["Medium"].append(prof.get("mediumSolved", 0))
+            cols["Hard"].append(prof.get("hardSolved", 0))
+            cols["Accuracy %"].append(compute_accuracy(prof))
+            cols["Rank"].append(prof.get("ranking", "N/A"))
+        st.session_state.prev_ranks[user] = prof.get("ranking", "N/A") if prof else "N/A"
+
+    progress.empty()
+
+    df = pd.DataFrame(cols).sort_values("Total Solved", ascending=False)
+    df.index = range(1, len(df) + 1)
+
+    # Rank movement since the last fetch (lower rank number = better)
+    prev = pd.to_numeric(df["Username"].map(prev_ranks), errors="coerce")
+    cur = pd.to_numeric(df["Rank"], errors="coerce")
+    diff = prev - cur
+    df["Rank Delta"] = np.select(
+        [prev.isna() | cur.isna(), diff > 0, diff < 0],
+        ["", "Up " + diff.astype("Int64").astype(str), "Down " + (-diff).astype("Int64").astype(str)],
+        default="No change",
+    )
+
+    all_skills = build_all_skills(skill_frames)
+    st.session_state.leaderboard = {
+        "users": tuple(usernames),
+        "fetched_at": time.time(),
+        "df": df,
+        "all_skills": all_skills,
+        "skill_matrix": build_skill_pivot(all_skills),
+        "errors": errors,
+    }
+
+loaded = st.session_state.leaderboard
+df, all_skills, skill_matrix = loaded["df"], loaded["all_skills"], loaded["skill_matrix"]
+for user, err in loaded["errors"].items():
+    st.error(f"Fetch error ({user}): {err}")
+
+if df.empty:
     st.warning("No data fetched. Check usernames or internet connection.")
     st.stop()
 
-df = pd.DataFrame(rows).sort_values("Total Solved", ascending=False)
-df.index = range(1, len(df) + 1)
-
 # ---------- Leaderboard ----------
 st.subheader("Leaderboard")
 c1, c2 = st.columns([4, 1])
 with c1:
     st.dataframe(df.drop(columns=["Rank Delta"]), hide_index=False, use_container_width=True)
 with c2:
-    csv = df.to_csv(index=False).encode()
-    st.download_button("Export CSV", csv, "leetcode_leaderboard.csv", "text/csv")
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8")
+    st.download_button("Export CSV", buf.getvalue(), "leetcode_leaderboard.csv", "text/csv")
 
 # Rank changes
-if any(df["Rank Delta"]):
+moved = df["Rank Delta"] != ""
+if moved.any():
     st.markdown("#### Rank Changes")
-    st.dataframe(df[df["Rank Delta"] != ""][["Username", "Rank Delta"]], hide_index=True)
+    st.dataframe(df.loc[moved, ["Username", "Rank Delta"]], hide_index=True)
 
 # ---------- Charts ----------
 tab1, tab2, tab3 = st.tabs(["Total Solved", "Difficulty Split", "Accuracy"])
 
 with tab1:
-    fig = px.bar(df, x="Username", y="Total Solved", text="Total Solved",
-                 title="Total Problems Solved", color="Total Solved",
-                 color_continuous_scale="Viridis")
-    fig.update_traces(textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(total_solved_fig(df), use_container_width=True)
 
 with tab2:
-    diff_df = df.melt(id_vars="Username", value_vars=["Easy", "Medium", "Hard"],
-                      var_name="Difficulty", value_name="Solved")
-    fig = px.bar(diff_df, x="Username", y="Solved", color="Difficulty",
-                 title="Problems Solved by Difficulty",
-                 color_discrete_map={"Easy": "#2ca02c", "Medium": "#ff7f0e", "Hard": "#d62728"})
-    fig.update_layout(barmode="stack")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(difficulty_fig(df), use_container_width=True)
 
     with st.expander("Per-user pie charts"):
-        for user in df["Username"]:
-            user_row = df[df["Username"] == user][["Easy", "Medium", "Hard"]].iloc[0]
-            fig_pie = px.pie(values=user_row.values, names=user_row.index,
-                             title=f"{user} – Difficulty")
-            st.plotly_chart(fig_pie, use_container_width=True)
+        # Only the selected user's chart is built and sent to the browser
+        user = st.selectbox("Show pie for user:", df["Username"])
+        user_row = df.loc[df["Username"] == user, ["Easy", "Medium", "Hard"]].iloc[0]
+        fig_pie = difficulty_pie_fig(user, int(user_row["Easy"]), int(user_row["Medium"]), int(user_row["Hard"]))
+        st.plotly_chart(fig_pie, use_container_width=True)
 
 with tab3:
-    fig = px.bar(df, x="Username", y="Accuracy %", text="Accuracy %",
-                 title="Submission Accuracy", color="Accuracy %",
-                 color_continuous_scale="Blues")
-    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(accuracy_fig(df), use_container_width=True)
 
 # ---------- NEW: Skill Filter & Filtered Tables ----------
 st.subheader("Skill Comparison")
 
 # Collect all unique skills
-all_skills = pd.concat(skill_dfs, ignore_index=True) if skill_dfs else pd.DataFrame()
 if not all_skills.empty:
-    unique_skills = sorted(all_skills["Skill"].unique(), key=lambda x: (-all_skills[all_skills["Skill"] == x]["Problems Solved"].sum(), x))
+    # Most-solved first; groupby sorts by name so a stable sort breaks ties alphabetically
+    totals = all_skills.groupby("Skill")["Problems Solved"].sum()
+    unique_skills = totals.sort_values(ascending=False, kind="stable").index.tolist()
     
     # Skill filter dropdown
     selected_skill = st.selectbox(
@@ -245,9 +491,7 @@ if not all_skills.empty:
     filtered_skills = all_skills if selected_skill == "All Skills" else all_skills[all_skills["Skill"] == selected_skill]
     
     if not filtered_skills.empty:
-        # Add sort key for level ordering
-        filtered_skills["_sort"] = filtered_skills["Level"].map(LEVEL_ORDER).fillna(2)
-        filtered_skills = filtered_skills.sort_values(["_sort", "Problems Solved"], ascending=[True, False])
+        filtered_skills = filtered_skills.sort_values(["Level", "Problems Solved"], ascending=[True, False])
         
         # Create comparison table: rows=users, columns=skills, values=problems solved
         if selected_skill == "All Skills":
@@ -266,21 +510,17 @@ if not all_skills.empty:
                     st.dataframe(other_skills[["Username", "Skill", "Problems Solved"]], hide_index=True)
         else:
             # Single skill comparison table
-            skill_pivot = filtered_skills.pivot_table(
-                index="Username",
-                values="Problems Solved",
-                aggfunc="sum",
-                fill_value=0
-            ).sort_values("Problems Solved", ascending=False)
+            skill_pivot = (
+                skill_matrix.xs(selected_skill, level="Skill").sum(axis=0)
+                .rename("Problems Solved").to_frame()
+                .sort_values("Problems Solved", ascending=False)
+            )
             
             st.markdown(f"**{selected_skill} – Problems Solved by User**")
             st.dataframe(skill_pivot, hide_index=False, use_container_width=True)
             
             # Bar chart for this skill
-            fig = px.bar(skill_pivot.reset_index(), x="Username", y="Problems Solved",
-                        title=f"{selected_skill} Comparison",
-                        color="Problems Solved", color_continuous_scale="Viridis")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(skill_comparison_fig(skill_pivot, selected_skill), use_container_width=True)
     else:
         st.info("No data available for selected filter.")
 else:
@@ -290,40 +530,19 @@ else:
 with st.expander("Full Skill Heatmap (All Skills)"):
     st.markdown("**Skill Strength Heatmap (Advanced to Fundamental)**")
     if not all_skills.empty:
-        all_skills["_sort"] = all_skills["Level"].map(LEVEL_ORDER).fillna(2)
-        pivot = all_skills.pivot_table(
-            index=["Skill", "Level", "_sort"],
-            columns="Username",
-            values="Problems Solved",
-            aggfunc="sum",
-            fill_value=0
-        ).reset_index()
-        pivot = pivot.sort_values("_sort").drop(columns="_sort")
-        y_labels = pivot["Skill"] + " (" + pivot["Level"] + ")"
-
-        fig = go.Figure(data=go.Heatmap(
-            z=pivot.drop(columns=["Skill", "Level"]).values,
-            x=pivot.columns[2:],
-            y=y_labels,
-            colorscale="YlGnBu",
-            text=pivot.drop(columns=["Skill", "Level"]).values,
-            texttemplate="%{text}",
-            textfont=dict(size=10)
-        ))
-        fig.update_layout(title="Problems Solved per Skill", height=600)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(skill_heatmap_fig(skill_matrix), use_container_width=True)
     else:
         st.info("No skill data available.")
 
 # ---------- Detailed per-user skill tables ----------
 with st.expander("Detailed per-user skill tables"):
+    skill_groups = dict(iter(all_skills.groupby("Username", sort=False))) if not all_skills.empty else {}
     for user in df["Username"]:
-        usr = all_skills[all_skills["Username"] == user].copy()
+        usr = skill_groups.get(user, pd.DataFrame())
         if not usr.empty:
-            usr["_sort"] = usr["Level"].map(LEVEL_ORDER).fillna(2)
-            usr = usr.sort_values(["_sort", "Problems Solved"], ascending=[True, False])
+            usr = usr.sort_values(["Level", "Problems Solved"], ascending=[True, False])
             st.markdown(f"**{user}**")
-            st.dataframe(usr.drop(columns=["Username", "_sort"]), hide_index=True)
+            st.dataframe(usr.drop(columns=["Username"]), hide_index=True)
 
 # ---------- Sidebar: Tracked Users List ----------
 st.sidebar.markdown("---")
@@ -343,10 +562,8 @@ if not edited.equals(users_df):
     st.sidebar.success("User list updated!")
     st.rerun()
 
-# Remove buttons
-for user in users_df["username"]:
-    c1, c2 = st.sidebar.columns([3, 1])
-    c1.write(user)
-    if c2.button("Remove", key=f"rm_{user}"):
-        remove_user(user)
-        st.rerun()
\ No newline at end of file
+# Remove users
+to_remove = st.sidebar.multiselect("Remove users", usernames)
+if st.sidebar.button("Remove Selected") and to_remove:
+    remove_users(to_remove)
+    st.rerun()
\ No newline at end of file